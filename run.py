@@ -13,49 +13,172 @@ Options:
     --debug     Run in debug mode
     --port      Specify the port to run on (default: 5000)
     --host      Specify the host to run on (default: 0.0.0.0)
+
+Without --debug the application is served by waitress; set WAITRESS_THREADS
+to change its worker thread count (default: 16). On Unix, gunicorn can be
+used instead, e.g. `gunicorn --worker-class gthread --threads 8 web_app.app:app`.
 """
 
 import os
 import sys
+import atexit
+import queue
+import threading
+import time
+import traceback
 import argparse
 import logging
-from logging.handlers import RotatingFileHandler
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 # Add the project directory to the path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PARENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PARENT_DIR not in sys.path:
+    sys.path.append(PARENT_DIR)
+
+# Shared by all handlers; %(created) is the record's epoch float, so no
+# strftime/localtime call is made per record
+LOG_FORMATTER = logging.Formatter('%(created).3f - %(name)s - %(levelname)s - %(message)s')
+
+# Single worker so backup renames from consecutive rollovers never interleave
+_ROTATION_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='log-rotation')
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that batches records into large binary writes
+
+    Records are encoded into a buffered binary stream instead of being
+    flushed one by one. A timer flushes the buffer shortly after the first
+    unflushed record so the file never lags far behind the application.
+    """
+
+    def __init__(self, *args, buffer_size=64 * 1024, flush_interval=0.5, **kwargs):
+        kwargs.setdefault('encoding', 'utf-8')
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._flush_timer = None
+        super().__init__(*args, **kwargs)
+        self._errors = getattr(self, 'errors', None) or 'strict'
+
+    def _open(self):
+        return open(self.baseFilename, self.mode + 'b', buffering=self.buffer_size)
+
+    def shouldRollover(self, record):
+        """Check the size limit without seeking, since a seek flushes the buffer"""
+        if self.stream is None:
+            self.stream = self._open()
+        msg = self.format(record) + self.terminator
+        return self._exceeds_max_bytes(len(msg.encode(self.encoding, self._errors)))
+
+    def _exceeds_max_bytes(self, size):
+        # BufferedWriter.tell() counts buffered bytes without flushing them
+        return self.maxBytes > 0 and self.stream.tell() + size >= self.maxBytes
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            data = msg.encode(self.encoding, self._errors)
+            if self.stream is None:
+                self.stream = self._open()
+            if self._exceeds_max_bytes(len(data)):
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(data)
+            self._schedule_flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
 
-# Import the Flask application
-from web_app.app import app
+    def _schedule_flush(self):
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval, self._timed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _timed_flush(self):
+        self.acquire()
+        try:
+            self._flush_timer = None
+        finally:
+            self.release()
+        self.flush()
+
+    def doRollover(self):
+        """Swap in a fresh log file and shift the backups in the background"""
+        if self.backupCount <= 0:
+            super().doRollover()
+            return
+        
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename):
+            pending = f"{self.baseFilename}.pending-{time.time_ns()}"
+            os.replace(self.baseFilename, pending)
+            _ROTATION_EXECUTOR.submit(self._shift_backups, pending)
+        if not self.delay:
+            self.stream = self._open()
+
+    def _shift_backups(self, pending):
+        try:
+            for i in range(self.backupCount - 1, 0, -1):
+                sfn = self.rotation_filename(f"{self.baseFilename}.{i}")
+                dfn = self.rotation_filename(f"{self.baseFilename}.{i + 1}")
+                if os.path.exists(sfn):
+                    os.replace(sfn, dfn)
+            dfn = self.rotation_filename(f"{self.baseFilename}.1")
+            if os.path.exists(dfn):
+                os.remove(dfn)
+            self.rotate(pending, dfn)
+        except OSError:
+            if logging.raiseExceptions:
+                traceback.print_exc(file=sys.stderr)
+
+    def close(self):
+        super().close()
+        self.acquire()
+        try:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        finally:
+            self.release()
 
 def setup_logging(debug=False):
     """Configure logging for the application"""
     # Create logs directory if it doesn't exist
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
+    os.makedirs('logs', exist_ok=True)
         
     # Set up logging
     log_level = logging.DEBUG if debug else logging.INFO
     
     # Configure root logger
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    if not root_logger.handlers:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(LOG_FORMATTER)
+        root_logger.addHandler(console_handler)
     
     # Set up file handler for application logs
-    file_handler = RotatingFileHandler(
+    file_handler = BufferedRotatingFileHandler(
         'logs/app.log', 
         maxBytes=10*1024*1024,  # 10 MB
         backupCount=10
     )
     file_handler.setLevel(log_level)
-    file_handler.setFormatter(logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    ))
+    file_handler.setFormatter(LOG_FORMATTER)
+    
+    # Write app logs from a background thread so request threads only enqueue
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
     
-    # Add file handler to app logger
+    # Add queue handler to app logger
     app_logger = logging.getLogger('web_app')
-    app_logger.addHandler(file_handler)
+    app_logger.addHandler(QueueHandler(log_queue))
     
     # Log startup information
     app_logger.info('Starting Renewable Energy Forecasting application')
@@ -75,23 +198,36 @@ def main():
     # Parse command line arguments
     args = parse_arguments()
     
+    # Import the Flask application only once we know the server will start
+    from web_app.app import app
+    
     # Set up logging
     setup_logging(args.debug)
     
     # Create required directories
-    for directory in ['uploads', 'models', 'results']:
-        if not os.path.exists(directory):
-            os.makedirs(directory)
+    for directory in ('uploads', 'models', 'results'):
+        os.makedirs(directory, exist_ok=True)
     
     # Set Flask environment variables
     os.environ['FLASK_ENV'] = 'development' if args.debug else 'production'
     
     # Run the application
-    app.run(
-        debug=args.debug,
-        host=args.host,
-        port=args.port
-    )
+    if args.debug:
+        app.run(
+            debug=True,
+            host=args.host,
+            port=args.port
+        )
+    else:
+        # Serve production traffic from a threaded WSGI server
+        from waitress import serve
+        serve(
+            app,
+            host=args.host,
+            port=args.port,
+            threads=int(os.environ.get('WAITRESS_THREADS', 16)),
+            backlog=128
+        )
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
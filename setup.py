@@ -17,63 +17,223 @@ Options:
 """
 
 import os
+import io
 import sys
+import atexit
+import posixpath
 import argparse
 import subprocess
 import logging
 import platform
+import json
 import shutil
 from pathlib import Path
+import urllib.error
 import urllib.request
 import zipfile
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import urllib3
+except ImportError:  # setup.py runs before requirements are installed
+    urllib3 = None
+
+class DeferredFlushStreamHandler(logging.StreamHandler):
+    """StreamHandler that leaves records buffered until an error or an explicit flush"""
+
+    def __init__(self, stream=None, flush_level=logging.ERROR):
+        super().__init__(stream)
+        self.flush_level = flush_level
+
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= self.flush_level:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+def _buffered_stderr(buffer_size=64 * 1024):
+    """Return a block-buffered text stream on the stderr file descriptor"""
+    try:
+        raw = io.FileIO(sys.stderr.fileno(), 'w', closefd=False)
+    except (AttributeError, OSError, ValueError):
+        return sys.stderr
+    return io.TextIOWrapper(io.BufferedWriter(raw, buffer_size),
+                            encoding=sys.stderr.encoding, errors='backslashreplace')
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+_log_handler = DeferredFlushStreamHandler(_buffered_stderr())
+_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+atexit.register(_log_handler.flush)
+
 logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(_log_handler)
+logger.propagate = False
 
 # Project root directory
 ROOT_DIR = Path(__file__).resolve().parent
 
+IS_WINDOWS = platform.system() == 'Windows'
+
+# Project directories, relative to ROOT_DIR
+PROJECT_DIRECTORIES = (
+    'data/raw/opsd',
+    'data/raw/era5',
+    'data/processed',
+    'data/models',
+    'logs',
+    'models',
+    'results',
+    'uploads',
+    'web_app/static/css',
+    'web_app/static/js',
+    'web_app/static/img',
+    'web_app/templates',
+    'notebooks',
+    'docs/images'
+)
+
+# Absolute directory paths, joined once at import
+_DIRECTORY_PATHS = {directory: os.fspath(ROOT_DIR / directory) for directory in PROJECT_DIRECTORIES}
+
 # Data URLs
 SAMPLE_DATA_URLS = {
     'opsd': 'https://data.open-power-system-data.org/time_series/2020-10-06/time_series_60min_singleindex.csv',
     'era5': 'https://example.com/sample_era5_data.zip'  # Example URL, would need to be updated
 }
 
+# Contents of the mock ERA5 data file
+_ERA5_PLACEHOLDER = (
+    b"# This is a placeholder for ERA5 data\n"
+    b"# In a real setup, you would use the CDS API to download actual data\n"
+)
+
+# Copy buffer size for streaming downloads to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Shared connection pool so repeated downloads reuse keep-alive connections
+_POOL = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=8,
+    retries=urllib3.Retry(3, backoff_factor=0.2)
+) if urllib3 else None
+
+def _existing_directories(directories):
+    """Return the directories that already exist, using one scandir per parent"""
+    existing = set()
+    for parent in {posixpath.dirname(directory) for directory in directories}:
+        try:
+            with os.scandir(ROOT_DIR / parent) as entries:
+                existing.update(posixpath.join(parent, entry.name) for entry in entries if entry.is_dir())
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return existing
+
+def _make_directory(directory):
+    """Create a project directory, returning False if it already existed"""
+    try:
+        os.makedirs(_DIRECTORY_PATHS[directory])
+    except FileExistsError:
+        return False
+    return True
+
 def create_directory_structure():
     """Create the necessary directory structure for the project"""
     logger.info("Creating directory structure...")
     
     # Create main directories
-    directories = [
-        'data/raw/opsd',
-        'data/raw/era5',
-        'data/processed',
-        'data/models',
-        'logs',
-        'models',
-        'results',
-        'uploads',
-        'web_app/static/css',
-        'web_app/static/js',
-        'web_app/static/img',
-        'web_app/templates',
-        'notebooks',
-        'docs/images'
-    ]
-    
-    for directory in directories:
-        dir_path = ROOT_DIR / directory
-        if not dir_path.exists():
-            dir_path.mkdir(parents=True, exist_ok=True)
-            logger.info(f"Created directory: {directory}")
+    existing = _existing_directories(PROJECT_DIRECTORIES)
+    missing = [directory for directory in PROJECT_DIRECTORIES if directory not in existing]
+    
+    # Create directories concurrently so slow filesystems overlap their latency
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        created = list(executor.map(_make_directory, missing))
+    
+    for directory, was_created in zip(missing, created):
+        if was_created:
+            logger.info("Created directory: %s", directory)
     
     logger.info("Directory structure created successfully.")
 
+def _run(command, **kwargs):
+    """Run a subprocess after flushing buffered log output so the two stay in order"""
+    _log_handler.flush()
+    return subprocess.run(command, **kwargs)
+
+def _head(url):
+    """Return the ETag and uncompressed Content-Length reported for a URL"""
+    headers = {'Accept-Encoding': 'identity'}
+    if _POOL is None:
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers, method='HEAD')) as r:
+                response_headers = r.headers
+        except urllib.error.HTTPError:
+            return None, None
+    else:
+        r = _POOL.request('HEAD', url, headers=headers)
+        if r.status >= 400:
+            return None, None
+        response_headers = r.headers
+    
+    length = response_headers.get('Content-Length')
+    return response_headers.get('ETag'), int(length) if length is not None else None
+
+def _open_url(url, headers):
+    """Open a streaming GET response, raising on HTTP errors"""
+    if _POOL is None:
+        return urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+    
+    r = _POOL.request('GET', url, headers=headers, preload_content=False, decode_content=True)
+    if r.status >= 400:
+        r.release_conn()
+        raise urllib3.exceptions.HTTPError(f"HTTP {r.status} for {url}")
+    return r
+
+def _download(url, dest_path):
+    """Stream a URL to a local file, reusing pooled connections when possible
+    
+    Returns False if the file was already complete and the download was skipped.
+    """
+    # Compare the remote file against what the last run recorded
+    meta_path = dest_path.parent / '.meta.json'
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        meta = {}
+    
+    etag, length = _head(url)
+    existing = dest_path.stat().st_size if dest_path.exists() else 0
+    
+    unchanged = etag is not None and meta.get(dest_path.name) == {'etag': etag, 'length': length}
+    if unchanged and existing == length:
+        return False
+    
+    if etag is not None:
+        meta[dest_path.name] = {'etag': etag, 'length': length}
+        meta_path.write_text(json.dumps(meta, indent=2))
+    
+    if unchanged and length is not None and 0 < existing < length:
+        # Resume the partial file; If-Range makes the server send it whole if it changed
+        logger.info("Resuming download of %s at byte %s", dest_path.name, existing)
+        headers = {'Range': f'bytes={existing}-', 'If-Range': etag, 'Accept-Encoding': 'identity'}
+    elif _POOL is not None:
+        # Ask for a compressed transfer; urllib3 decodes it while streaming
+        headers = {'Accept-Encoding': 'gzip'}
+    else:
+        headers = {}
+    
+    with _open_url(url, headers) as r:
+        with open(dest_path, 'ab' if r.status == 206 else 'wb') as f:
+            shutil.copyfileobj(r, f, length=DOWNLOAD_CHUNK_SIZE)
+        if _POOL is not None:
+            r.release_conn()
+    return True
+
 def download_sample_data():
     """Download sample data files"""
     logger.info("Downloading sample data...")
@@ -83,19 +243,25 @@ def download_sample_data():
     opsd_path = ROOT_DIR / 'data/raw/opsd/time_series_60min_singleindex.csv'
     
     try:
-        logger.info(f"Downloading OPSD data from {opsd_url}")
-        urllib.request.urlretrieve(opsd_url, opsd_path)
-        logger.info(f"Downloaded OPSD data to {opsd_path}")
+        logger.info("Downloading OPSD data from %s", opsd_url)
+        _log_handler.flush()
+        if _download(opsd_url, opsd_path):
+            logger.info("Downloaded OPSD data to %s", opsd_path)
+        else:
+            logger.info("OPSD data at %s is up to date, skipping download", opsd_path)
     except Exception as e:
-        logger.error(f"Failed to download OPSD data: {e}")
+        logger.error("Failed to download OPSD data: %s", e)
     
     # Download ERA5 data (mock - in a real setup, this would use the CDS API)
     # For this example, we'll just create a placeholder file
     era5_path = ROOT_DIR / 'data/raw/era5/sample_era5_data.nc'
-    with open(era5_path, 'w') as f:
-        f.write("# This is a placeholder for ERA5 data\n")
-        f.write("# In a real setup, you would use the CDS API to download actual data\n")
-    logger.info(f"Created ERA5 data placeholder at {era5_path}")
+    # O_BINARY keeps Windows from translating the newlines
+    fd = os.open(era5_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        os.write(fd, _ERA5_PLACEHOLDER)
+    finally:
+        os.close(fd)
+    logger.info("Created ERA5 data placeholder at %s", era5_path)
         
     logger.info("Sample data setup completed.")
 
@@ -116,54 +282,59 @@ def setup_virtual_environment():
     
     # Determine virtual environment path and activation script
     venv_path = ROOT_DIR / 'venv'
-    if platform.system() == 'Windows':
+    if IS_WINDOWS:
         activate_script = venv_path / 'Scripts' / 'activate'
         python_path = venv_path / 'Scripts' / 'python.exe'
     else:
         activate_script = venv_path / 'bin' / 'activate'
         python_path = venv_path / 'bin' / 'python'
     
-    # Create virtual environment
-    if venv_path.exists():
-        logger.info(f"Virtual environment already exists at {venv_path}")
+    # Create virtual environment unless a usable interpreter is already in place
+    if python_path.is_file() and os.access(python_path, os.X_OK):
+        logger.info("Virtual environment already exists at %s", venv_path)
     else:
         try:
             if venv_available:
-                logger.info(f"Creating virtual environment using venv at {venv_path}")
-                subprocess.run([python_exec, '-m', 'venv', str(venv_path)], check=True)
+                logger.info("Creating virtual environment using venv at %s", venv_path)
+                _run([python_exec, '-m', 'venv', str(venv_path)], check=True)
             else:
                 # Try using virtualenv if venv is not available
-                logger.info(f"Creating virtual environment using virtualenv at {venv_path}")
-                subprocess.run([python_exec, '-m', 'pip', 'install', 'virtualenv'], check=True)
-                subprocess.run([python_exec, '-m', 'virtualenv', str(venv_path)], check=True)
+                logger.info("Creating virtual environment using virtualenv at %s", venv_path)
+                _run([python_exec, '-m', 'pip', 'install', 'virtualenv'], check=True)
+                _run([python_exec, '-m', 'virtualenv', str(venv_path)], check=True)
                 
             logger.info("Virtual environment created successfully.")
         except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to create virtual environment: {e}")
+            logger.error("Failed to create virtual environment: %s", e)
             return
     
-    # Install dependencies
+    # Install dependencies, preferring uv's parallel installer when available
     try:
-        if platform.system() == 'Windows':
-            # On Windows, we need to run a batch file to activate the environment
-            command = f'"{python_path}" -m pip install -r requirements.ini'
-            logger.info(f"Installing dependencies: {command}")
-            subprocess.run(command, shell=True, check=True)
-        else:
-            # On Unix-like systems, we can use the source command
-            command = f'"{python_path}" -m pip install -r requirements.ini'
-            logger.info(f"Installing dependencies: {command}")
-            subprocess.run(command, shell=True, check=True)
+        installed = False
+        uv_exec = shutil.which('uv')
+        if uv_exec:
+            command = [uv_exec, 'pip', 'install', '--python', str(python_path), '-r', 'requirements.ini']
+            logger.info("Installing dependencies: %s", ' '.join(command))
+            installed = _run(command).returncode == 0
+            if not installed:
+                logger.warning("uv failed to install dependencies. Falling back to pip.")
+        
+        if not installed:
+            command = [str(python_path), '-m', 'pip', 'install', '--disable-pip-version-check',
+                       '--no-input', '-r', 'requirements.ini']
+            pip_env = {**os.environ, 'PIP_DISABLE_PIP_VERSION_CHECK': '1', 'PYTHONDONTWRITEBYTECODE': '1'}
+            logger.info("Installing dependencies: %s", ' '.join(command))
+            _run(command, env=pip_env, check=True)
             
         logger.info("Dependencies installed successfully.")
     except subprocess.CalledProcessError as e:
-        logger.error(f"Failed to install dependencies: {e}")
+        logger.error("Failed to install dependencies: %s", e)
         
     # Print activation instructions
-    if platform.system() == 'Windows':
-        logger.info(f"\nTo activate the virtual environment, run:\n  {activate_script}")
+    if IS_WINDOWS:
+        logger.info("\nTo activate the virtual environment, run:\n  %s", activate_script)
     else:
-        logger.info(f"\nTo activate the virtual environment, run:\n  source {activate_script}")
+        logger.info("\nTo activate the virtual environment, run:\n  source %s", activate_script)
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -174,31 +345,35 @@ def parse_arguments():
 
 def main():
     """Main function to run the setup"""
-    logger.info("Starting Renewable Energy Forecasting project setup...")
-    
-    # Parse command line arguments
-    args = parse_arguments()
-    
-    # Create directory structure
-    create_directory_structure()
-    
-    # Download sample data
-    if not args.no_download:
-        download_sample_data()
-    else:
-        logger.info("Skipping sample data download.")
-    
-    # Setup virtual environment
-    if not args.no_venv:
-        setup_virtual_environment()
-    else:
-        logger.info("Skipping virtual environment setup.")
-    
-    logger.info("Setup completed successfully!")
-    logger.info("\nTo run the web application:")
-    logger.info("1. Activate the virtual environment")
-    logger.info("2. Run 'python run.py'")
-    logger.info("3. Open your browser and navigate to http://localhost:5000")
+    # Flush in finally so buffered context lines come out before any traceback
+    try:
+        logger.info("Starting Renewable Energy Forecasting project setup...")
+        
+        # Parse command line arguments
+        args = parse_arguments()
+        
+        # Create directory structure
+        create_directory_structure()
+        
+        # Download sample data
+        if not args.no_download:
+            download_sample_data()
+        else:
+            logger.info("Skipping sample data download.")
+        
+        # Setup virtual environment
+        if not args.no_venv:
+            setup_virtual_environment()
+        else:
+            logger.info("Skipping virtual environment setup.")
+        
+        logger.info("Setup completed successfully!")
+        logger.info("\nTo run the web application:")
+        logger.info("1. Activate the virtual environment")
+        logger.info("2. Run 'python run.py'")
+        logger.info("3. Open your browser and navigate to http://localhost:5000")
+    finally:
+        _log_handler.flush()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file